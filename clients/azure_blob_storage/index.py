@@ -1,9 +1,21 @@
 import os
-from azure.storage.blob import BlobServiceClient
+import streamlit as st
+from azure.storage.blob import BlobServiceClient, ContainerClient
 
 
+@st.cache_resource
 def get_or_create_blob_service_client() -> BlobServiceClient:
     connection_str = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
     if not connection_str:
         raise RuntimeError("Missing AZURE_STORAGE_CONNECTION_STRING")
-    return BlobServiceClient.from_connection_string(connection_str)
+    # Streamed uploads are staged in 4 MiB blocks instead of one buffered put
+    return BlobServiceClient.from_connection_string(
+        connection_str,
+        max_block_size=4 * 1024 * 1024,
+        max_single_put_size=4 * 1024 * 1024,
+    )
+
+
+@st.cache_resource
+def get_or_create_container_client(container_name: str) -> ContainerClient:
+    return get_or_create_blob_service_client().get_container_client(container_name)
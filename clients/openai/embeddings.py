@@ -0,0 +1,25 @@
+import numpy as np
+
+from common.utils import chunk_list, get_openai_client
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+# The embeddings endpoint accepts at most 2048 inputs per request
+MAX_INPUTS_PER_REQUEST = 2048
+
+
+def embed_batch(texts: list[str]) -> np.ndarray:
+    """
+    Embed `texts` in as few requests as possible.
+    Rows are L2-normalized, so `a @ b.T` gives cosine similarities.
+    """
+    vectors = []
+    for chunk in chunk_list(texts, MAX_INPUTS_PER_REQUEST):
+        response = get_openai_client().embeddings.create(
+            model=EMBEDDING_MODEL, input=chunk
+        )
+        vectors.extend(item.embedding for item in response.data)
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if not len(matrix):
+        return matrix
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
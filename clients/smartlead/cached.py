@@ -0,0 +1,21 @@
+import streamlit as st
+
+from clients.smartlead import index
+from clients.smartlead.schema import (
+    SmartleadCampaign,
+    SmartleadCampaignStatistics,
+)
+
+# Smartlead read endpoints are shared by every session, so cache them across
+# reruns and users. Call `<fn>.clear()` to force a refetch.
+CACHE_TTL_SECONDS = 300
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def get_campaigns() -> list[SmartleadCampaign]:
+    return index.get_campaigns()
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def get_campaign_statistics(campaign_id: int) -> SmartleadCampaignStatistics:
+    return index.get_campaign_statistics(campaign_id)
@@ -1,21 +1,30 @@
-from ast import List
-import logging
-import requests
+import json
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 from typing import Optional, Dict, Any
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 from clients.smartlead.schema import (
     SmartleadCampaign,
     SmartleadCampaignLead,
     SmartleadCampaignSequence,
-    SmartleadCampaignSequenceInput,
     SmartleadCampaignStatistics,
     SmartleadGetCampaignLeadsResponse,
 )
+from clients.smartlead.session import create_client
 
 
 SMARTLEAD_API = "https://server.smartlead.ai/api/v1/"
 
+_CLIENT = create_client()
+
+# Whole-list validators, compiled once at import
+_CAMPAIGN_LIST = TypeAdapter(list[SmartleadCampaign])
+_SEQUENCE_LIST = TypeAdapter(list[SmartleadCampaignSequence])
+
+# Concurrent page requests when paginating a campaign's leads
+LEAD_PAGE_WORKERS = 8
+
 
 def query_smartlead(
     endpoint: str,
@@ -24,12 +33,31 @@ def query_smartlead(
     body: Optional[Any] = None,
     query_params: Optional[Dict[str, Any]] = None,
 ) -> Any:
+    return json.loads(
+        query_smartlead_raw(
+            endpoint=endpoint,
+            method=method,
+            headers=headers,
+            body=body,
+            query_params=query_params,
+        )
+    )
+
+
+def query_smartlead_raw(
+    endpoint: str,
+    method: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[Any] = None,
+    query_params: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """Same as query_smartlead but returns the undecoded body, for Pydantic's validate_json."""
     url = f"{SMARTLEAD_API}{endpoint}"
     params = query_params or {}
     params["api_key"] = st.secrets["SMARTLEAD_API_KEY"]
 
     try:
-        response = requests.request(
+        response = _CLIENT.request(
             method=method.upper(),
             url=url,
             headers=headers,
@@ -38,8 +66,8 @@ def query_smartlead(
             timeout=30,
         )
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.HTTPError as e:
+        return response.content
+    except httpx.HTTPStatusError as e:
         try:
             error_data = response.json()
             error_msg = error_data.get("error", str(e))
@@ -50,15 +78,15 @@ def query_smartlead(
         raise Exception(
             f"Email Server Error with {endpoint} - {error_msg} : {detailed_msg}"
         ) from e
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise Exception(f"Email Server Error with {endpoint} - {str(e)}") from e
 
 
 def get_campaign_by_id(campaign_id: int) -> SmartleadCampaign:
-    result: Any = query_smartlead(endpoint=f"campaigns/{campaign_id}", method="GET")
+    raw = query_smartlead_raw(endpoint=f"campaigns/{campaign_id}", method="GET")
 
     try:
-        campaign = SmartleadCampaign.model_validate(result)
+        campaign = SmartleadCampaign.model_validate_json(raw)
         return campaign
     except ValidationError as e:
         raise ValueError(
@@ -70,8 +98,8 @@ def get_leads_by_campaign_id_with_pagination(
     campaign_id: int,
     lead_category_id: Optional[int] = None,
     event_time: Optional[str] = None,
-) -> List[SmartleadCampaignLead]:
-    leads: List[SmartleadCampaignLead] = []
+) -> list[SmartleadCampaignLead]:
+    leads: list[SmartleadCampaignLead] = []
 
     # Initial request
     params = {}
@@ -80,56 +108,51 @@ def get_leads_by_campaign_id_with_pagination(
     if lead_category_id:
         params["lead_category_id"] = lead_category_id
 
-    try:
-        response = query_smartlead(
+    # Retries (connects, rate limits, 5xx) happen once, in the client's transport
+    def fetch_page(offset: int) -> SmartleadGetCampaignLeadsResponse:
+        raw = query_smartlead_raw(
             endpoint=f"campaigns/{campaign_id}/leads",
             method="GET",
-            query_params=params,
+            query_params={**params, "offset": offset},
         )
-        first_page = SmartleadGetCampaignLeadsResponse.model_validate(response)
-        total_leads = first_page.total_leads
-        leads.extend(first_page.data)
-    except Exception as e:
-        logging.error(f"Error fetching first page: {e}")
-        return leads
+        return SmartleadGetCampaignLeadsResponse.model_validate_json(raw)
 
-    # Pagination
-    while len(leads) < total_leads:
-        page = []
-        try:
-            offset_params = {"offset": len(leads)}
-            if event_time:
-                offset_params["event_time_gt"] = event_time
-
-            response = query_smartlead(
-                endpoint=f"campaigns/{campaign_id}/leads",
-                method="GET",
-                query_params=offset_params,
-            )
-
-            page = SmartleadGetCampaignLeadsResponse.model_validate(response)
+    # A failed page raises rather than returning a partial list: callers decide which
+    # leads to remove from this data, so missing pages must not go unnoticed
+    try:
+        first_page = fetch_page(0)
+    except Exception as e:
+        raise RuntimeError(
+            f"Failed to get leads for campaign {campaign_id} at offset 0: {e}"
+        ) from e
+    leads.extend(first_page.data)
 
-            leads.extend(page.data)
-        except Exception as e:
-            logging.error(
-                f"Error getting leads for campaign {campaign_id} at offset {len(leads)}: {e}"
-            )
-            continue
+    # Pagination: the first page tells us every remaining offset, so fetch them concurrently
+    if not first_page.data or first_page.limit <= 0:
+        return leads
+    offsets = range(first_page.limit, first_page.total_leads, first_page.limit)
+
+    with ThreadPoolExecutor(max_workers=LEAD_PAGE_WORKERS) as executor:
+        pages = {offset: executor.submit(fetch_page, offset) for offset in offsets}
+        for offset, future in pages.items():
+            try:
+                leads.extend(future.result().data)
+            except Exception as e:
+                for pending in pages.values():
+                    pending.cancel()
+                raise RuntimeError(
+                    f"Failed to get leads for campaign {campaign_id} at offset {offset}: {e}"
+                ) from e
 
     return leads
 
 
 def get_campaigns() -> list[SmartleadCampaign]:
-    result = query_smartlead("/campaigns", method="GET")
-
-    if not isinstance(result, list):
-        raise RuntimeError(
-            f"Unexpected Smartlead response (expected list, got {type(result)}): {result}"
-        )
+    raw = query_smartlead_raw("/campaigns", method="GET")
 
     try:
-        # 🚀 Pydantic v2: validate a list of campaign objects
-        return [SmartleadCampaign.model_validate(item) for item in result]
+        # 🚀 Pydantic v2: parse and validate the whole list in one core call
+        return _CAMPAIGN_LIST.validate_json(raw)
 
     except ValidationError as e:
         raise RuntimeError(f"Smartlead campaign schema validation failed:\n{e}") from e
@@ -151,19 +174,14 @@ def get_campaign_statistics(campaign_id: str) -> SmartleadCampaignStatistics:
         ) from e
 
 
-def get_campaign_sequences(campaign_id: int) -> List[SmartleadCampaignSequence]:
-    result = query_smartlead(
+def get_campaign_sequences(campaign_id: int) -> list[SmartleadCampaignSequence]:
+    raw = query_smartlead_raw(
         endpoint=f"/campaigns/{campaign_id}/sequences",
         method="GET",
     )
 
-    if not isinstance(result, list):
-        raise RuntimeError(
-            f"Unexpected Smartlead response for sequences (expected list, got {type(result)}): {result}"
-        )
-
     try:
-        return [SmartleadCampaignSequence.model_validate(item) for item in result]
+        return _SEQUENCE_LIST.validate_json(raw)
     except ValidationError as e:
         raise RuntimeError(
             f"Smartlead campaign sequences schema validation failed for campaign {campaign_id}:\n{e}"
@@ -171,15 +189,12 @@ def get_campaign_sequences(campaign_id: int) -> List[SmartleadCampaignSequence]:
 
 
 def add_sequences_to_campaign(
-    *, campaign_id: int, input_sequences: List[SmartleadCampaignSequenceInput]
+    *, campaign_id: int, sequences_payload: list[Dict[str, Any]]
 ) -> None:
-    try:
-        sequences_payload = [
-            seq.model_dump(by_alias=True, exclude_none=True) for seq in input_sequences
-        ]
-    except ValidationError as e:
-        raise RuntimeError(f"Sequence input validation failed: {e}") from e
-
+    """
+    Replace a campaign's sequences with `sequences_payload`.
+    Each item is the JSON shape of SmartleadCampaignSequenceInput, passed through as-is.
+    """
     try:
         query_smartlead(
             endpoint=f"/campaigns/{int(campaign_id)}/sequences",
@@ -1,6 +1,9 @@
 import os
 from typing import Any, Dict, Optional
-import requests
+import httpx
+from clients.smartlead.session import create_client
+
+_CLIENT = create_client(headers={"Content-Type": "application/json"})
 
 
 def remove_multiple_leads_from_campaign(
@@ -44,11 +47,19 @@ def update_smartlead_campaign_follow_up_percentage(
         "changes": {"follow_up_percentage": int(follow_up_percentage)},
     }
 
-    query_smartlead_internal_graphql_endpoint(
-        query=query,
-        variables=variables,
-        operation_name="updateCampaignById",
+    result = query_smartlead_internal_graphql_endpoint(
+        method="POST",
+        body={
+            "query": query,
+            "variables": variables,
+            "operationName": "updateCampaignById",
+        },
     )
+    if result.get("errors"):
+        raise SmartleadGraphQLError(
+            f"Email Server Error with GraphQL - {result['errors']}"
+        )
+    return result["data"]["update_email_campaigns_by_pk"]["id"]
 
 
 def query_smartlead_internal_rest_endpoint(
@@ -58,9 +69,6 @@ def query_smartlead_internal_rest_endpoint(
     headers: dict = None,
     query_params: dict = None,
 ) -> dict:
-    import requests
-    import os
-
     base_url = "https://server.smartlead.ai/api/"
     url = f"{base_url}{endpoint}"
 
@@ -68,15 +76,12 @@ def query_smartlead_internal_rest_endpoint(
     if not auth_token:
         raise RuntimeError("Missing SMARTLEAD_INTERNAL_API_TOKEN")
 
-    final_headers = {
-        "Authorization": f"Bearer {auth_token}",
-        "Content-Type": "application/json",
-    }
+    final_headers = {"Authorization": f"Bearer {auth_token}"}
     if headers:
         final_headers.update(headers)
 
     try:
-        response = requests.request(
+        response = _CLIENT.request(
             method=method.upper(),
             url=url,
             headers=final_headers,
@@ -86,7 +91,7 @@ def query_smartlead_internal_rest_endpoint(
         )
         response.raise_for_status()
         return response.json()
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         try:
             err_json = response.json()
             err_msg = err_json.get("error", str(e))
@@ -121,10 +126,7 @@ def query_smartlead_internal_graphql_endpoint(
     if not token:
         raise SmartleadGraphQLError("Missing SMARTLEAD_INTERNAL_API_TOKEN env var")
 
-    base_headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
+    base_headers = {"Authorization": f"Bearer {token}"}
     merged_headers = {**base_headers, **(headers or {})}
 
     # Try to extract operationName for debug logs (mirrors the TS behavior)
@@ -133,7 +135,7 @@ def query_smartlead_internal_graphql_endpoint(
         op_name = body.get("operationName")
 
     try:
-        resp = requests.request(
+        resp = _CLIENT.request(
             method=method.upper(),
             url=INTERNAL_SMARTLEAD_GRAPHQL_API,
             headers=merged_headers,
@@ -145,7 +147,7 @@ def query_smartlead_internal_graphql_endpoint(
         resp.raise_for_status()
         return resp.json()
 
-    except requests.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         # HTTP error with a response payload
         err_data = None
         try:
@@ -163,7 +165,7 @@ def query_smartlead_internal_graphql_endpoint(
             msg = f"Email Server Error with GraphQL - {getattr(err_data, 'error', None) or resp.text or str(e)}"
         raise SmartleadGraphQLError(msg) from e
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         # Network/timeout/connection issues
         # Try to pull nested response error message if present
         msg = f"Email Server Error with GraphQL - {getattr(getattr(e, 'response', None), 'text', None) or str(e)}"
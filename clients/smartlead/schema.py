@@ -69,33 +69,6 @@ class SmartleadGetCampaignLeadsResponse(BaseModel):
     data: List[SmartleadCampaignLead]
 
 
-class SchedulerCronValue(BaseModel):
-    tz: str
-    days: List[int]
-    endHour: str
-    startHour: str
-
-
-class SmartleadCampaign(BaseModel):
-    id: int
-    user_id: int
-    created_at: str
-    updated_at: str
-    status: StatusEnum
-    name: str
-    track_settings: List[str]
-    scheduler_cron_value: Optional[SchedulerCronValue]
-    min_time_btwn_emails: int
-    max_leads_per_day: int
-    stop_lead_settings: str
-    enable_ai_esp_matching: bool
-    send_as_plain_text: bool
-    follow_up_percentage: int
-    unsubscribe_text: Optional[str]
-    parent_campaign_id: Optional[int]
-    client_id: Optional[int]
-
-
 class CampaignLeadStats(BaseModel):
     total: int
     paused: int
@@ -125,8 +98,6 @@ class SmartleadCampaignStatistics(BaseModel):
     bounce_count: str
     unsubscribed_count: str
 
-    sequence_count: str
-
     unique_open_count: str
     unique_click_count: str
     unique_sent_count: str
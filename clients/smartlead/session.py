@@ -0,0 +1,67 @@
+import math
+import time
+from typing import Dict, Optional
+
+import httpx
+
+RETRY_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 0.5
+# Upper bound on a server-requested Retry-After wait
+RETRY_AFTER_MAX_SECONDS = 30
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+# Only replay requests that are safe to repeat; a 502/504 on a POST may arrive after
+# Smartlead already applied it (e.g. a sequence save), so POSTs are never retried
+RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+
+class RetryTransport(httpx.HTTPTransport):
+    """
+    HTTP transport that retries rate limits and transient 5xx on idempotent requests,
+    with exponential backoff. httpx itself only retries failed connects (see
+    `retries=`), not error statuses.
+    """
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in RETRY_METHODS:
+            return super().handle_request(request)
+
+        for attempt in range(RETRY_ATTEMPTS):
+            response = super().handle_request(request)
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt == RETRY_ATTEMPTS - 1
+            ):
+                # Hand the last response back so callers can surface its error body
+                return response
+
+            delay = _retry_delay(response.headers.get("Retry-After"), attempt)
+            response.close()
+            time.sleep(delay)
+        return response
+
+
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    # Numeric Retry-After is honoured up to RETRY_AFTER_MAX_SECONDS; anything else
+    # (missing, an HTTP-date, garbage) falls back to exponential backoff
+    try:
+        seconds = float(retry_after)
+    except (TypeError, ValueError):
+        seconds = math.nan
+    if not math.isfinite(seconds) or seconds < 0:
+        return RETRY_BACKOFF_SECONDS * 2**attempt
+    return min(seconds, RETRY_AFTER_MAX_SECONDS)
+
+
+def create_client(headers: Optional[Dict[str, str]] = None) -> httpx.Client:
+    """
+    Build a pooled HTTP/2 client for Smartlead traffic.
+    - Multiplexes concurrent requests over shared keep-alive TLS connections
+    - Retries rate limits and transient 5xx with exponential backoff
+    - Safe to share across the worker threads used for campaign/lead fan-out
+    """
+    transport = RetryTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        retries=3,
+    )
+    return httpx.Client(timeout=30, headers=headers, transport=transport)
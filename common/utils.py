@@ -1,12 +1,16 @@
-from openai import OpenAI
-import csv
-import io
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 import streamlit as st
 
 
+@st.cache_resource
+def get_openai_client() -> OpenAI:
+    # One client per process so its HTTP connection pool is reused across calls
+    return OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+
+
 def get_gpt_answer(system_prompt, user_prompt, temperature=0.7):
-    openAIClient = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-    response = openAIClient.chat.completions.create(
+    response = get_openai_client().chat.completions.create(
         model="gpt-4o",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -17,11 +21,33 @@ def get_gpt_answer(system_prompt, user_prompt, temperature=0.7):
     return response.choices[0].message.content.strip().lower()
 
 
-# ---------------------- Helper Functions ----------------------
+def create_async_openai_client(max_connections: int) -> AsyncOpenAI:
+    # Not cached like get_openai_client: an async connection pool is bound to the
+    # event loop that opened it, and every asyncio.run() starts a new loop
+    return AsyncOpenAI(
+        api_key=st.secrets["OPENAI_API_KEY"],
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            )
+        ),
+    )
 
 
-def csv_to_json(file_content):
-    return list(csv.DictReader(io.StringIO(file_content.decode("utf-8"))))
+async def get_gpt_answer_async(client, system_prompt, user_prompt, temperature=0.7):
+    response = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=temperature,
+    )
+    return response.choices[0].message.content.strip().lower()
+
+
+# ---------------------- Helper Functions ----------------------
 
 
 def chunk_list(lst, chunk_size):
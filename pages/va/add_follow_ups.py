@@ -1,18 +1,16 @@
+import asyncio
+import threading
+import time
 import streamlit as st
 import pandas as pd
-from typing import Optional, List
-
-from clients.smartlead.index import (
-    SmartleadCampaignSequenceInput,
-    add_sequences_to_campaign,
-    get_campaign_sequences,
-    get_campaign_statistics,
-    get_campaigns,
-)
+from typing import Any, Callable, Dict, Optional, List, Set, Tuple
+
+from clients.smartlead.cached import get_campaign_statistics, get_campaigns
+from clients.smartlead.index import add_sequences_to_campaign, get_campaign_sequences
 from clients.smartlead.internal.index import (
     update_smartlead_campaign_follow_up_percentage,
 )
-from clients.smartlead.schema import SeqDelayDetailsInput, SequenceVariantInput
+from clients.smartlead.schema import SmartleadCampaignSequence
 
 st.title("Add Follow-ups to Smartlead Campaigns")
 
@@ -25,6 +23,67 @@ ss.setdefault("running_add_followups", False)
 ss.setdefault("successful_campaigns", [])
 ss.setdefault("failed_campaigns", [])
 
+# Campaigns are independent, so run them concurrently up to this cap
+MAX_CONCURRENT_CAMPAIGNS = 10
+# Backpressure for the runner's work queue
+CAMPAIGN_QUEUE_SIZE = 200
+# How long a campaign is awaited before it is reported as timed out. This does not
+# bound wall time: the call's thread can't be interrupted and keeps running, and
+# asyncio.run() waits for it before returning.
+CAMPAIGN_TIMEOUT_SECONDS = 120
+# Minimum seconds between progress redraws
+PROGRESS_UPDATE_INTERVAL = 1.0
+
+RESULT_COLUMNS = ["Campaign ID", "Campaign Name", "Link", "Error"]
+
+
+def sequence_to_payload(seq: SmartleadCampaignSequence) -> Dict[str, Any]:
+    """Smartlead sequence input JSON for an existing sequence (None fields omitted)."""
+    payload: Dict[str, Any] = {
+        "id": seq.id,
+        "seq_number": seq.seq_number,
+        "subject": seq.subject,
+        "email_body": seq.email_body,
+        "seq_delay_details": {"delay_in_days": int(seq.seq_delay_details.delayInDays)},
+    }
+    if seq.sequence_variants:
+        payload["seq_variants"] = [
+            {
+                key: value
+                for key, value in {
+                    "id": v.id,
+                    "subject": v.subject,
+                    "email_body": v.email_body,
+                    "variant_label": v.variant_label,
+                    "variant_distribution_percentage": v.variant_distribution_percentage,
+                }.items()
+                if value is not None
+            }
+            for v in seq.sequence_variants
+        ]
+    return payload
+
+
+def clone_sequence_payload(
+    payload: Dict[str, Any], *, seq_number: int, delay_in_days: int
+) -> Dict[str, Any]:
+    """Copy of a sequence payload as a new sequence: ids unset, renumbered and re-delayed."""
+    clone = {key: value for key, value in payload.items() if key != "id"}
+    clone["seq_number"] = seq_number
+    clone["seq_delay_details"] = {"delay_in_days": int(delay_in_days)}
+    if "seq_variants" in payload:
+        clone["seq_variants"] = [
+            {key: value for key, value in variant.items() if key != "id"}
+            for variant in payload["seq_variants"]
+        ]
+    return clone
+
+
+@st.cache_resource
+def get_campaign_locks() -> Tuple[threading.Lock, Dict[int, threading.Lock]]:
+    """Per-campaign locks shared by every rerun and session, plus a lock guarding the dict."""
+    return threading.Lock(), {}
+
 
 def add_follow_ups_to_campaign(
     *,
@@ -32,6 +91,32 @@ def add_follow_ups_to_campaign(
     delay_period: int,
     expected_sequence_length: Optional[int] = None,
 ) -> None:
+    # Single-flight per campaign: a second overlapping run would append the follow-ups twice
+    registry_lock, campaign_locks = get_campaign_locks()
+    with registry_lock:
+        lock = campaign_locks.setdefault(int(smartlead_campaign_id), threading.Lock())
+    if not lock.acquire(blocking=False):
+        raise RuntimeError(
+            f"Follow-ups are already being added to campaign {smartlead_campaign_id}; skipped"
+        )
+    try:
+        append_follow_up_sequences(
+            smartlead_campaign_id=smartlead_campaign_id,
+            delay_period=delay_period,
+            expected_sequence_length=expected_sequence_length,
+        )
+    finally:
+        lock.release()
+
+
+def append_follow_up_sequences(
+    *,
+    smartlead_campaign_id: int,
+    delay_period: int,
+    expected_sequence_length: Optional[int] = None,
+) -> None:
+    # Always read sequences fresh: they are rewritten below, so a cached copy
+    # could drop or duplicate steps.
     sequences = get_campaign_sequences(int(smartlead_campaign_id))
 
     if (
@@ -40,74 +125,28 @@ def add_follow_ups_to_campaign(
     ):
         return  # nothing to do
 
-    # Build inputs for the original sequences
-    original_inputs: List[SmartleadCampaignSequenceInput] = []
-    for seq in sequences:
-        variants = None
-        if seq.sequence_variants:
-            variants = [
-                SequenceVariantInput(
-                    id=v.id,
-                    subject=v.subject,
-                    email_body=v.email_body,
-                    variant_label=v.variant_label,
-                    variant_distribution_percentage=v.variant_distribution_percentage,
-                )
-                for v in seq.sequence_variants
-            ]
-        original_inputs.append(
-            SmartleadCampaignSequenceInput(
-                id=seq.id,
-                seq_number=seq.seq_number,
-                subject=seq.subject,
-                email_body=seq.email_body,
-                seq_delay_details=SeqDelayDetailsInput(
-                    delay_in_days=int(seq.seq_delay_details.delayInDays)
-                ),
-                seq_variants=variants,
-            )
-        )
-
-    # Build inputs for the appended follow-up sequences (duplicates)
-    clones: List[SmartleadCampaignSequenceInput] = []
-    for index, seq in enumerate(sequences):
-        # New sequence numbering continues after existing length
-        new_seq_number = len(sequences) + index + 1
-        # First appended seq uses the provided delay_period; the rest keep their original delay
-        new_delay = (
-            int(delay_period) if index == 0 else int(seq.seq_delay_details.delayInDays)
-        )
+    originals = [sequence_to_payload(seq) for seq in sequences]
 
-        clone_variants = None
-        if seq.sequence_variants:
-            clone_variants = [
-                SequenceVariantInput(
-                    id=None,  # new variant ids are unset
-                    subject=v.subject,
-                    email_body=v.email_body,
-                    variant_label=v.variant_label,
-                    variant_distribution_percentage=v.variant_distribution_percentage,
-                )
-                for v in seq.sequence_variants
-            ]
-
-        clones.append(
-            SmartleadCampaignSequenceInput(
-                id=None,  # new sequence id is unset
-                seq_number=new_seq_number,
-                subject=seq.subject,
-                email_body=seq.email_body,
-                seq_delay_details=SeqDelayDetailsInput(delay_in_days=new_delay),
-                seq_variants=clone_variants,  # can be None
-            )
+    # Appended follow-up sequences duplicate the originals
+    clones = [
+        clone_sequence_payload(
+            payload,
+            # New sequence numbering continues after existing length
+            seq_number=len(sequences) + index + 1,
+            # First appended seq uses the provided delay_period; the rest keep their original delay
+            delay_in_days=(
+                int(delay_period)
+                if index == 0
+                else payload["seq_delay_details"]["delay_in_days"]
+            ),
         )
-
-    input_sequences = original_inputs + clones
+        for index, payload in enumerate(originals)
+    ]
 
     try:
         add_sequences_to_campaign(
             campaign_id=int(smartlead_campaign_id),
-            input_sequences=input_sequences,
+            sequences_payload=originals + clones,
         )
     except Exception as e:
         raise RuntimeError(
@@ -115,13 +154,141 @@ def add_follow_ups_to_campaign(
         ) from e
 
 
-# --- 1) Fetch campaigns for selection ---
+def needs_follow_up_bump(campaign_id: int) -> bool:
+    """Whether a campaign reached >=70% sent (or has 0 leads) and should move to 90% follow-up."""
+    stats = get_campaign_statistics(int(campaign_id))
+    # Expect structure similar to TS:
+    # stats["campaign_lead_stats"]["total"], stats["unique_sent_count"]
+    total_leads = int(stats.campaign_lead_stats.total)
+    unique_sent_count = int(stats.unique_sent_count)
+    sent_ratio = 0 if total_leads == 0 else unique_sent_count / total_leads
+    return total_leads == 0 or sent_ratio >= 0.70
+
+
+async def run_for_campaigns(
+    fn: Callable[[int], Any],
+    campaign_ids: List[int],
+    on_done: Optional[Callable[[int, Optional[Exception]], None]] = None,
+) -> Dict[int, Any]:
+    """
+    Call fn(campaign_id) for every campaign through a bounded queue drained by
+    MAX_CONCURRENT_CAMPAIGNS workers, each call running in a thread with a timeout.
+    Returns {campaign_id: result}, holding the raised exception for campaigns that failed.
+
+    on_done runs here, not in the workers, so an exception it raises (e.g. Streamlit's
+    StopException once the user presses Stop) cancels the run and propagates.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CAMPAIGN_QUEUE_SIZE)
+    finished: asyncio.Queue = asyncio.Queue()
+    results: Dict[int, Any] = {}
+
+    async def feed() -> None:
+        for cid in campaign_ids:
+            await queue.put(cid)  # waits while the queue is full
+
+    async def worker() -> None:
+        while True:
+            cid = await queue.get()
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.to_thread(fn, cid), CAMPAIGN_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                result = TimeoutError(
+                    f"Timed out after {CAMPAIGN_TIMEOUT_SECONDS}s; "
+                    "Smartlead may still apply the change"
+                )
+            except Exception as e:
+                result = e
+            results[cid] = result
+            finished.put_nowait(cid)
+
+    tasks = [asyncio.create_task(feed())] + [
+        asyncio.create_task(worker())
+        for _ in range(min(MAX_CONCURRENT_CAMPAIGNS, len(campaign_ids)))
+    ]
+    try:
+        for _ in campaign_ids:
+            cid = await finished.get()
+            if on_done:
+                result = results[cid]
+                on_done(cid, result if isinstance(result, Exception) else None)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return results
+
+
+async def process_campaigns(
+    campaign_ids: List[int],
+    *,
+    delay_period: int,
+    follow_up_check_ids: Set[int],
+    on_done: Callable[[int, Optional[Exception]], None],
+) -> None:
+    """Add follow-ups to every campaign in concurrent phases, calling on_done as each campaign finishes."""
+    failed: Dict[int, Exception] = {}
+
+    # Phase 1: fetch analytics and decide which campaigns need the 90% bump
+    verdicts = await run_for_campaigns(
+        needs_follow_up_bump, [cid for cid in campaign_ids if cid in follow_up_check_ids]
+    )
+    need_bump = set()
+    for cid, verdict in verdicts.items():
+        if isinstance(verdict, Exception):
+            failed[cid] = verdict
+        elif verdict:
+            need_bump.add(cid)
+
+    # Phase 2: bump follow-up percentages
+    bumps = await run_for_campaigns(
+        lambda cid: update_smartlead_campaign_follow_up_percentage(
+            campaign_id=cid, follow_up_percentage=90
+        ),
+        [cid for cid in campaign_ids if cid in need_bump],
+    )
+    failed.update({cid: e for cid, e in bumps.items() if isinstance(e, Exception)})
+
+    for cid, error in failed.items():
+        on_done(cid, error)
+
+    # Phase 3: add follow-ups to every campaign that got this far
+    await run_for_campaigns(
+        lambda cid: add_follow_ups_to_campaign(
+            smartlead_campaign_id=cid, delay_period=int(delay_period)
+        ),
+        [cid for cid in campaign_ids if cid not in failed],
+        on_done=on_done,
+    )
+
+
+def build_results_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Columnar (Arrow-backed) results table, cheap for st.dataframe to serialize."""
+    return pd.DataFrame.from_records(rows, columns=RESULT_COLUMNS).astype(
+        {
+            "Campaign Name": "string[pyarrow]",
+            "Link": "string[pyarrow]",
+            "Error": "string[pyarrow]",
+        }
+    )
+
+
+@st.cache_data(show_spinner=False)
+def build_campaign_options(campaigns: tuple) -> dict:
+    """Map multiselect labels to campaign ids from (id, name) pairs."""
+    return {f"Campaign ID: {cid}, name: {name or ''}": cid for cid, name in campaigns}
+
+
+# --- 1) Fetch campaigns for selection (cached across reruns and sessions) ---
+if st.button("🔄 Refresh campaigns"):
+    get_campaigns.clear()
+
 with st.spinner("Loading campaigns..."):
-    if not ss.all_campaigns:
-        ss.all_campaigns = get_campaigns()  # expect list of {id, name, ...}
+    ss.all_campaigns = get_campaigns()  # expect list of {id, name, ...}
 
 # Build multiselect options as label->id mapping
-options = {f"Campaign ID: {c.id}, name: {c.name or ''}": c.id for c in ss.all_campaigns}
+options = build_campaign_options(tuple((c.id, c.name) for c in ss.all_campaigns))
+id_to_label = {cid: lbl for lbl, cid in options.items()}
 
 # --- 2) Inputs ---
 selected_labels = st.multiselect(
@@ -133,7 +300,10 @@ selected_labels = st.multiselect(
     key="campaign_multiselect",
 )
 
-ss.selected_campaigns = [options[lbl] for lbl in selected_labels]
+# Ordered dedup, dropping labels that no longer map to a known campaign
+ss.selected_campaigns = list(
+    dict.fromkeys(int(options[lbl]) for lbl in selected_labels if lbl in options)
+)
 
 ss.delay_period = st.number_input(
     "Enter the delay period before starting the follow-ups",
@@ -160,69 +330,80 @@ if st.button("🚀 Add Follow-ups to Selected Campaigns"):
         st.rerun()
 
 # --- 4) Runner block with spinner & progress ---
-if ss.running_add_followups:
+def run_follow_ups() -> None:
     total = len(ss.selected_campaigns)
     progress = st.progress(0)
     status = st.empty()
+    # Redraw at most every ~1% of campaigns and PROGRESS_UPDATE_INTERVAL seconds
+    redraw_every = max(1, total // 100)
+    last_progress_update = 0.0
+
+    def record_result(cid: int, error: Optional[Exception]) -> None:
+        nonlocal last_progress_update
+        label = id_to_label.get(cid, f"Campaign ID: {cid}")
+        row = {
+            "Campaign ID": cid,
+            "Campaign Name": label,
+            "Link": f"https://app.smartlead.ai/app/email-campaign/{cid}/analytics",
+            "Error": "N/A",
+        }
+        if error is None:
+            ss.successful_campaigns.append(row)
+        else:
+            row["Error"] = str(error) or "Error adding follow-ups"
+            ss.failed_campaigns.append(row)
+
+        done = len(ss.successful_campaigns) + len(ss.failed_campaigns)
+        now = time.monotonic()
+        if done == total or (
+            done % redraw_every == 0
+            and now - last_progress_update >= PROGRESS_UPDATE_INTERVAL
+        ):
+            last_progress_update = now
+            status.write(f"Processed {done}/{total}: {label}")
+            progress.progress(done / total)
+
+    # Campaigns already at >=90% were bumped before; skip their statistics fetch
+    follow_up_check_ids = set()
+    if ss.change_follow_up_percentage:
+        by_id = {c.id: c for c in ss.all_campaigns}
+        follow_up_check_ids = {
+            cid
+            for cid in ss.selected_campaigns
+            if cid not in by_id or by_id[cid].follow_up_percentage < 90
+        }
 
     with st.spinner("Adding follow-ups to campaigns..."):
-        for i, cid in enumerate(ss.selected_campaigns, start=1):
-            label = next(
-                (lbl for lbl, _cid in options.items() if _cid == cid),
-                f"Campaign ID: {cid}",
+        asyncio.run(
+            process_campaigns(
+                ss.selected_campaigns,
+                delay_period=int(ss.delay_period),
+                follow_up_check_ids=follow_up_check_ids,
+                on_done=record_result,
             )
-            try:
-                # Optional 90% follow-up percentage bump
-                if ss.change_follow_up_percentage:
-                    stats = get_campaign_statistics(int(cid))
-                    # Expect structure similar to TS:
-                    # stats["campaign_lead_stats"]["total"], stats["unique_sent_count"]
-                    total_leads = int(stats.campaign_lead_stats.total)
-                    unique_sent_count = int(stats.unique_sent_count)
-                    sent_ratio = (
-                        0 if total_leads == 0 else unique_sent_count / total_leads
-                    )
-
-                    if total_leads == 0 or sent_ratio >= 0.70:
-                        update_smartlead_campaign_follow_up_percentage(
-                            campaign_id=int(cid), follow_up_percentage=90
-                        )
-
-                # Add follow-ups
-                add_follow_ups_to_campaign(
-                    smartlead_campaign_id=int(cid),
-                    delay_period=int(ss.delay_period),
-                )
+        )
 
-                ss.successful_campaigns.append(
-                    {
-                        "Campaign ID": cid,
-                        "Campaign Name": label,
-                        "Link": f"https://app.smartlead.ai/app/email-campaign/{cid}/analytics",
-                        "Error": "N/A",
-                    }
-                )
-            except Exception as e:
-                ss.failed_campaigns.append(
-                    {
-                        "Campaign ID": cid,
-                        "Campaign Name": label,
-                        "Link": f"https://app.smartlead.ai/app/email-campaign/{cid}/analytics",
-                        "Error": str(e) or "Error adding follow-ups",
-                    }
-                )
-            finally:
-                status.write(f"Processed {i}/{total}: {label}")
-                progress.progress(i / total)
+    if follow_up_check_ids:
+        # follow_up_percentage may have changed; refetch the list next run
+        get_campaigns.clear()
 
-    # Done
-    ss.running_add_followups = False
+
+if ss.running_add_followups:
+    try:
+        run_follow_ups()
+    finally:
+        # Done (or stopped)
+        ss.running_add_followups = False
 
     # --- 5) Output tables ---
     if ss.successful_campaigns:
         st.success("✅ Successfully Added Follow-ups")
-        st.dataframe(pd.DataFrame(ss.successful_campaigns), use_container_width=True)
+        st.dataframe(
+            build_results_frame(ss.successful_campaigns), use_container_width=True
+        )
 
     if ss.failed_campaigns:
         st.error("❌ Failed to Add Follow-ups")
-        st.dataframe(pd.DataFrame(ss.failed_campaigns), use_container_width=True)
+        st.dataframe(
+            build_results_frame(ss.failed_campaigns), use_container_width=True
+        )
@@ -1,138 +1,496 @@
 import asyncio
+import json
+import logging
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from io import BytesIO
+from typing import Awaitable, Iterator
 
-from azure.storage.blob import ContentSettings
+from azure.storage.blob import BlobType, ContentSettings
+from openai import AsyncOpenAI
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from clients.azure_blob_storage.index import get_or_create_blob_service_client
+from clients.azure_blob_storage.index import get_or_create_container_client
+from clients.openai.embeddings import embed_batch
 
 from clients.smartlead.index import (
     get_campaign_by_id,
     get_leads_by_campaign_id_with_pagination,
 )
 from clients.smartlead.internal.index import remove_multiple_leads_from_campaign
-from common.utils import chunk_list, csv_to_json, get_gpt_answer
+from clients.smartlead.schema import SmartleadCampaign
+from common.utils import chunk_list, create_async_openai_client, get_gpt_answer_async
+
+# Campaign list/details are reused across reruns for this long
+CACHE_TTL_SECONDS = 300
+# A campaign's email -> lead index is reused across filter runs for this long
+LEAD_INDEX_TTL_SECONDS = 120
+# Concurrent get_campaign_by_id calls when loading an organization's campaigns
+CAMPAIGN_FETCH_WORKERS = 16
+# Max GPT checks in flight at once while filtering leads
+LEAD_GPT_CONCURRENCY = int(os.environ.get("LEAD_GPT_CONCURRENCY", "50"))
+# Size of each TSV piece handed to the blob upload
+TSV_CHUNK_SIZE = 64 * 1024
+# Cosine similarity at which a value counts as the same as a whitelist entry
+EMBEDDING_MATCH_THRESHOLD = 0.9
+# Leads per Smartlead removal request, and removal requests in flight at once
+REMOVE_BATCH_SIZE = 100
+REMOVE_WORKERS = 8
+# Minimum seconds between progress redraws while filtering
+PROGRESS_UPDATE_INTERVAL = 0.25
 
 # ========================== Helpers ==========================
 
 
+def tsv_field(value) -> str:
+    # Plain TSV with no quoting: tabs and line breaks inside a value become spaces
+    if value is None:
+        return ""
+    return str(value).replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+
+def iter_tsv_chunks(leads: list[dict]) -> Iterator[bytes]:
+    """Encode leads as TSV in ~TSV_CHUNK_SIZE pieces, so the full file is never buffered."""
+    header = list(dict.fromkeys(key for lead in leads for key in lead))
+    rows, size = ["\t".join(map(tsv_field, header))], 0
+    for lead in leads:
+        row = "\t".join(tsv_field(lead.get(key)) for key in header)
+        rows.append(row)
+        size += len(row) + 1
+        if size >= TSV_CHUNK_SIZE:
+            yield ("\n".join(rows) + "\n").encode("utf-8")
+            rows, size = [], 0
+    if rows:
+        yield ("\n".join(rows) + "\n").encode("utf-8")
+
+
 def upload_filtered_leads_to_blob(
     leads_to_remove: list[dict], campaign_label: str
 ) -> str:
-    df = pd.DataFrame(leads_to_remove)
-    tsv_buffer = BytesIO()
-    df.to_csv(tsv_buffer, sep="\t", index=False)
-    tsv_buffer.seek(0)
-
-    blob_service_client = get_or_create_blob_service_client()
-    container_name = os.environ.get("SMARTLEAD_TRIAGE_CONTAINER")
-    container_client = blob_service_client.get_container_client(container_name)
+    container_client = get_or_create_container_client(
+        os.environ.get("SMARTLEAD_TRIAGE_CONTAINER")
+    )
 
     blob_name = (
         f"filtered-leads-{campaign_label}-{datetime.today().strftime('%Y-%m-%d')}.tsv"
     )
     blob_client = container_client.get_blob_client(blob_name)
 
+    # Stream the TSV; the SDK stages it as blocks as the chunks arrive
     blob_client.upload_blob(
-        tsv_buffer,
+        iter_tsv_chunks(leads_to_remove),
+        blob_type=BlobType.BLOCKBLOB,
         overwrite=True,
         content_settings=ContentSettings(content_type="text/tab-separated-values"),
     )
     return blob_client.url
 
 
-async def is_outside_whitelisted_area(location: str, whitelisted_areas: str) -> bool:
+async def is_outside_whitelisted_area(
+    client: AsyncOpenAI, location: str, whitelisted_areas: list[str]
+) -> bool:
     if not location or not whitelisted_areas:
         return False
     system = (
         "You are a helpful assistant that filters addresses based on whitelisted areas. "
-        "The whitelisted areas are:\n" + whitelisted_areas.replace(";", "\n")
+        "The whitelisted areas are:\n" + "\n".join(whitelisted_areas)
     )
     prompt = (
         f"Is the address {location} located within any of the whitelisted areas? "
         f"You answer should strictly be 'yes' or 'no'"
     )
-    ans = await asyncio.to_thread(get_gpt_answer, system, prompt)
+    ans = await get_gpt_answer_async(client, system, prompt)
     return (ans or "").strip().lower() == "no"
 
 
 async def is_in_blocklisted_industry(
-    industry: str, blocklisted_industries: str
+    client: AsyncOpenAI, industry: str, blocklisted_industries: list[str]
 ) -> bool:
     if not industry or not blocklisted_industries:
         return False
     system = (
         "You are a helpful assistant that filters industries based on blocklisted industries:\n"
-        + blocklisted_industries.replace(";", "\n")
+        + "\n".join(blocklisted_industries)
     )
     prompt = (
         f"Does the industry {industry} match any of the blocklisted industries? "
         f"Answer strictly 'yes' or 'no'"
     )
-    ans = await asyncio.to_thread(get_gpt_answer, system, prompt)
+    ans = await get_gpt_answer_async(client, system, prompt)
     return (ans or "").strip().lower() == "yes"
 
 
 async def is_outside_whitelisted_industry(
-    industry: str, whitelisted_industries: str
+    client: AsyncOpenAI, industry: str, whitelisted_industries: list[str]
 ) -> bool:
     if not industry or not whitelisted_industries:
         return False
     system = (
         "You are a helpful assistant that filters industries based on whitelisted industries:\n"
-        + whitelisted_industries.replace(";", "\n")
+        + "\n".join(whitelisted_industries)
     )
     prompt = (
         f"Does the industry {industry} stay within any of the whitelisted industries? "
         f"Answer strictly 'yes' or 'no'"
     )
-    ans = await asyncio.to_thread(get_gpt_answer, system, prompt, 0.2)
+    ans = await get_gpt_answer_async(client, system, prompt, 0.2)
     return (ans or "").strip().lower() == "no"
 
 
+def normalize(value: str | None) -> str:
+    return (value or "").strip().lower()
+
+
+def parse_verdict(answer: str, keys: list[str]) -> dict[str, bool] | None:
+    """Read {key: true/false} for every key from a GPT answer; None if any key is missing."""
+    text = answer or ""
+    try:
+        data = json.loads(text[text.find("{") : text.rfind("}") + 1])
+        if isinstance(data, dict) and all(isinstance(data.get(k), bool) for k in keys):
+            return {k: data[k] for k in keys}
+    except ValueError:
+        pass
+
+    # Fallback for answers that aren't valid JSON (stray text, trailing commas...)
+    verdict = {}
+    for key in keys:
+        match = re.search(rf'"?{key}"?\s*:\s*(true|false)', text)
+        if not match:
+            return None
+        verdict[key] = match.group(1) == "true"
+    return verdict
+
+
+async def classify_industry(
+    client: AsyncOpenAI,
+    industry: str,
+    *,
+    blocklisted_industries: list[str],
+    whitelisted_industries: list[str],
+) -> bool:
+    """Check both industry rules with a single GPT call; True if the industry is filtered out."""
+    questions = {}
+    lists = []
+    if industry and blocklisted_industries:
+        questions["blocked_industry"] = (
+            f"Does the industry {industry} match any of the blocklisted industries?"
+        )
+        lists.append(
+            "Blocklisted industries:\n" + "\n".join(blocklisted_industries)
+        )
+    if industry and whitelisted_industries:
+        questions["outside_whitelist_industry"] = (
+            f"Does the industry {industry} fall outside all of the whitelisted industries?"
+        )
+        lists.append(
+            "Whitelisted industries:\n" + "\n".join(whitelisted_industries)
+        )
+    if not questions:
+        return False
+
+    system = (
+        "You are a helpful assistant that filters industries.\n\n" + "\n\n".join(lists)
+    )
+    prompt = (
+        "\n".join(f"{key}: {question}" for key, question in questions.items())
+        + "\n\nAnswer strictly with a JSON object mapping each key above to true or false."
+    )
+    ans = await get_gpt_answer_async(client, system, prompt, 0.2)
+    verdict = parse_verdict(ans, list(questions))
+    if verdict is not None:
+        return any(verdict.values())
+
+    # Unparseable answer: fall back to one call per rule. Run them one after the
+    # other, since the caller holds a single concurrency slot for this industry.
+    return await is_in_blocklisted_industry(
+        client, industry, blocklisted_industries
+    ) or await is_outside_whitelisted_industry(client, industry, whitelisted_industries)
+
+
+def split_terms(value: str) -> list[str]:
+    """Distinct normalized entries of a semicolon-separated filter string."""
+    return list(
+        dict.fromkeys(term for term in map(normalize, (value or "").split(";")) if term)
+    )
+
+
+def match_exactly(
+    locations: set[str],
+    industries: set[str],
+    *,
+    whitelisted_areas: list[str],
+    blocklisted_industries: list[str],
+    whitelisted_industries: list[str],
+) -> tuple[dict[str, bool], dict[str, bool]]:
+    """
+    Decide the locations/industries that are literally one of the filter entries, with no
+    network call. Same ({location: outside_area}, {industry: filtered_out}) shape as
+    match_by_embeddings; an exact blocklist entry is filtered out, and an exact
+    whitelist entry is kept unless a blocklist is also set.
+    """
+    block_set = set(blocklisted_industries)
+    location_verdicts = dict.fromkeys(locations & set(whitelisted_areas), False)
+    industry_verdicts = dict.fromkeys(industries & block_set, True)
+    if not block_set:
+        industry_verdicts.update(
+            dict.fromkeys(industries & set(whitelisted_industries), False)
+        )
+    return location_verdicts, industry_verdicts
+
+
+def matches(
+    vectors: np.ndarray, row: dict[str, int], values: list[str], terms: list[str]
+) -> dict[str, bool]:
+    """{value: whether it embeds within EMBEDDING_MATCH_THRESHOLD of any term}."""
+    if not values or not terms:
+        return dict.fromkeys(values, False)
+    similarity = vectors[[row[v] for v in values]] @ vectors[[row[t] for t in terms]].T
+    return dict(zip(values, similarity.max(axis=1) >= EMBEDDING_MATCH_THRESHOLD))
+
+
+async def match_by_embeddings(
+    locations: set[str],
+    industries: set[str],
+    *,
+    whitelisted_areas: list[str],
+    blocklisted_industries: list[str],
+    whitelisted_industries: list[str],
+) -> tuple[dict[str, bool], dict[str, bool]]:
+    """
+    Keep the locations/industries that are near-identical to a whitelist entry, using one
+    batched embeddings call. Returns ({location: outside_area}, {industry: filtered_out})
+    for the values it could decide; every verdict here is "keep".
+
+    Similarity never removes a lead: "Medical Devices" embeds close to a blocklisted
+    "Medical Practices", so blocklist checks are left for GPT. Low similarity isn't "no
+    match" either: an address rarely embeds close to the region containing it.
+    """
+    locations = sorted(loc for loc in locations if loc) if whitelisted_areas else []
+    # With a blocklist, a whitelisted industry can still be blocked; GPT decides those
+    industries = (
+        sorted(ind for ind in industries if ind)
+        if whitelisted_industries and not blocklisted_industries
+        else []
+    )
+    if not locations and not industries:
+        return {}, {}
+
+    texts = list(
+        dict.fromkeys(
+            [
+                *whitelisted_areas,
+                *whitelisted_industries,
+                *locations,
+                *industries,
+            ]
+        )
+    )
+    try:
+        vectors = await asyncio.to_thread(embed_batch, texts)
+    except Exception as e:
+        logging.warning(f"Embedding prefilter unavailable, using GPT for all: {e}")
+        return {}, {}
+    row = {text: i for i, text in enumerate(texts)}
+
+    inside_area = matches(vectors, row, locations, whitelisted_areas)
+    location_verdicts = {
+        location: False  # inside a whitelisted area
+        for location, matched in inside_area.items()
+        if matched
+    }
+
+    inside_whitelist = matches(vectors, row, industries, whitelisted_industries)
+    industry_verdicts = {
+        industry: False  # within a whitelisted industry
+        for industry, matched in inside_whitelist.items()
+        if matched
+    }
+
+    return location_verdicts, industry_verdicts
+
+
+async def with_semaphore(semaphore: asyncio.Semaphore, check: Awaitable[bool]) -> bool:
+    async with semaphore:
+        return await check
+
+
 async def process_leads(
     raw_leads: list[dict],
     *,
-    blocklisted_industries: str,
-    whitelisted_industries: str,
-    whitelisted_areas: str,
+    blocklisted_industries: list[str],
+    whitelisted_industries: list[str],
+    whitelisted_areas: list[str],
 ) -> list[dict]:
     """Return the subset of leads to remove, based on location/industry rules."""
-    leads_to_remove: list[dict] = []
-    batches = list(chunk_list(raw_leads, 50))
-    total_batches = len(batches)
-
-    status_placeholder = st.empty()
-    for batch_idx, batch in enumerate(batches, 1):
-        status_placeholder.text(
-            f"Processing batch {batch_idx}/{total_batches} ({len(batch)} leads)..."
-        )
+    # One concurrency cap across all checks, so a slow call never stalls a whole batch
+    semaphore = asyncio.Semaphore(LEAD_GPT_CONCURRENCY)
+
+    # Classify each distinct location/industry once, however many leads share it
+    locations = {normalize(lead.get("Location")) for lead in raw_leads}
+    industries = {normalize(lead.get("informalIndustry")) for lead in raw_leads}
+
+    # Settle literal matches for free, then keep near-exact whitelist matches by
+    # embedding similarity; only the rest go to GPT
+    location_verdicts, industry_verdicts = match_exactly(
+        locations,
+        industries,
+        whitelisted_areas=whitelisted_areas,
+        blocklisted_industries=blocklisted_industries,
+        whitelisted_industries=whitelisted_industries,
+    )
+    embedded_locations, embedded_industries = await match_by_embeddings(
+        locations - location_verdicts.keys(),
+        industries - industry_verdicts.keys(),
+        whitelisted_areas=whitelisted_areas,
+        blocklisted_industries=blocklisted_industries,
+        whitelisted_industries=whitelisted_industries,
+    )
+    location_verdicts.update(embedded_locations)
+    industry_verdicts.update(embedded_industries)
+
+    # Native async client: no thread hop per call, and its connection pool is sized
+    # to the concurrency cap. Closed (with its pool) once every check has finished.
+    async with create_async_openai_client(LEAD_GPT_CONCURRENCY) as client:
+        location_tasks = {
+            location: asyncio.create_task(
+                with_semaphore(
+                    semaphore,
+                    is_outside_whitelisted_area(client, location, whitelisted_areas),
+                )
+            )
+            for location in locations
+            if location not in location_verdicts
+        }
+        industry_tasks = {
+            industry: asyncio.create_task(
+                with_semaphore(
+                    semaphore,
+                    classify_industry(
+                        client,
+                        industry,
+                        blocklisted_industries=blocklisted_industries,
+                        whitelisted_industries=whitelisted_industries,
+                    ),
+                )
+            )
+            for industry in industries
+            if industry not in industry_verdicts
+        }
+
+        tasks = [*location_tasks.values(), *industry_tasks.values()]
+        total = len(tasks)
+        progress = st.progress(0.0, text="Filtering leads...")
+        # Each redraw is a websocket message; throttle them off the hot loop
+        last_progress_update = time.monotonic()
+        for done, next_done in enumerate(asyncio.as_completed(tasks), 1):
+            await next_done
+            now = time.monotonic()
+            if now - last_progress_update >= PROGRESS_UPDATE_INTERVAL:
+                last_progress_update = now
+                progress.progress(
+                    done / total,
+                    text=f"Checked {done}/{total} distinct locations and industries...",
+                )
+
+    location_verdicts.update(
+        {loc: task.result() for loc, task in location_tasks.items()}
+    )
+    industry_verdicts.update(
+        {ind: task.result() for ind, task in industry_tasks.items()}
+    )
+    leads_to_remove = [
+        lead
+        for lead in raw_leads
+        if location_verdicts[normalize(lead.get("Location"))]
+        or industry_verdicts[normalize(lead.get("informalIndustry"))]
+    ]
+    progress.progress(
+        1.0, text=f"Processing complete: {len(leads_to_remove)} total leads to remove"
+    )
+    return leads_to_remove
 
-        async def check_one(lead: dict):
-            loc = lead.get("Location")
-            industry = lead.get("informalIndustry")
-            if await is_outside_whitelisted_area(loc, whitelisted_areas):
-                return lead
-            if await is_in_blocklisted_industry(industry, blocklisted_industries):
-                return lead
-            if await is_outside_whitelisted_industry(industry, whitelisted_industries):
-                return lead
-            return None
 
-        results = await asyncio.gather(*(check_one(lead) for lead in batch))
-        filtered = [x for x in results if x is not None]
-        leads_to_remove.extend(filtered)
-        status_placeholder.text(
-            f"Batch {batch_idx}/{total_batches} complete: {len(filtered)} leads filtered out"
-        )
+@st.cache_data(show_spinner=False)
+def compute_org_options(campaigns_df: pd.DataFrame) -> dict:
+    """Active organizations as {organizationId: organizationName}."""
+    active = campaigns_df.loc[
+        campaigns_df["organizationPaused"].eq(False),
+        ["organizationId", "organizationName"],
+    ]
+    return (
+        active.drop_duplicates("organizationId")
+        .set_index("organizationId")["organizationName"]
+        .to_dict()
+    )
 
-    status_placeholder.text(
-        f"Processing complete: {len(leads_to_remove)} total leads to remove"
+
+@st.cache_data(show_spinner=False)
+def compute_org_campaign_ids(campaigns_df: pd.DataFrame, org_id) -> tuple[int, ...]:
+    """Sorted Smartlead campaign ids for an organization (a stable cache key)."""
+    org_campaigns = campaigns_df.loc[campaigns_df["organizationId"] == org_id]
+    return tuple(sorted(org_campaigns["campaignId"].astype(int).tolist()))
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def enrich_campaigns(
+    campaign_ids: tuple[int, ...],
+) -> tuple[list[SmartleadCampaign], list[tuple[int, str]]]:
+    """Fetch Smartlead details for each campaign; returns (campaigns, [(campaign_id, error)])."""
+    details, errors = [], []
+    with ThreadPoolExecutor(max_workers=CAMPAIGN_FETCH_WORKERS) as executor:
+        futures = [executor.submit(get_campaign_by_id, cid) for cid in campaign_ids]
+        for campaign_id, future in zip(campaign_ids, futures):
+            try:
+                details.append(future.result())
+            except ValueError as e:
+                errors.append((campaign_id, str(e)))
+    return details, errors
+
+
+@st.cache_data(ttl=LEAD_INDEX_TTL_SECONDS, show_spinner=False)
+def campaign_email_index(campaign_id: int) -> dict[str, tuple[int, int]]:
+    """
+    All of a campaign's leads as {email: (lead id, campaign lead map id)}.
+    Raises if any page can't be fetched, so an incomplete index is never cached.
+    """
+    leads = get_leads_by_campaign_id_with_pagination(campaign_id=campaign_id)
+    return {
+        lead.lead.email: (lead.lead.id, lead.campaign_lead_map_id) for lead in leads
+    }
+
+
+def remove_batch(campaign_id: int, batch: list[dict]) -> None:
+    remove_multiple_leads_from_campaign(
+        smartlead_campaign_id=str(campaign_id),
+        email_lead_ids=[ld["leadId"] for ld in batch],
+        email_lead_map_ids=[ld["leadMappingId"] for ld in batch],
     )
-    return leads_to_remove
+
+
+def remove_leads_in_batches(
+    campaign_id: int, lead_details: list[dict]
+) -> tuple[int, list[tuple[list[dict], str]]]:
+    """
+    Remove leads in REMOVE_BATCH_SIZE requests fanned out over a thread pool.
+    Returns (removed, [(failed batch, error)]).
+    """
+    batches = list(chunk_list(lead_details, REMOVE_BATCH_SIZE))
+    removed, failed = 0, []
+    with ThreadPoolExecutor(max_workers=REMOVE_WORKERS) as executor:
+        futures = [
+            executor.submit(remove_batch, campaign_id, batch) for batch in batches
+        ]
+        for batch, future in zip(batches, futures):
+            try:
+                future.result()
+                removed += len(batch)
+            except Exception as e:
+                failed.append((batch, str(e)))
+    return removed, failed
 
 
 # ========================== UI & State ==========================
@@ -165,12 +523,10 @@ SELECT
 FROM smart_lead_campaigns slc
 LEFT JOIN platform_organizations po ON slc."platformOrganizationId" = po.id
 """
-campaigns = conn.query(query)
+campaigns = conn.query(query, ttl=CACHE_TTL_SECONDS)
 
 # Filter active orgs
-active_orgs = campaigns[campaigns["organizationPaused"] == False]
-unique_orgs = active_orgs.drop_duplicates(subset=["organizationId"])
-org_options = unique_orgs.set_index("organizationId")["organizationName"].to_dict()
+org_options = compute_org_options(campaigns)
 
 ss.selected_org_id = st.selectbox(
     "Select an active organization",
@@ -185,14 +541,11 @@ ss.selected_org_id = st.selectbox(
 )
 
 # Filter campaigns for the org
-org_campaigns = campaigns[campaigns["organizationId"] == ss.selected_org_id]
-campaign_details = []
-for _, row in org_campaigns.iterrows():
-    try:
-        campaign_detail = get_campaign_by_id(int(row["campaignId"]))
-        campaign_details.append(campaign_detail)
-    except ValueError as e:
-        st.error(f"Error fetching campaign {row['campaignId']}: {e}")
+campaign_details, campaign_errors = enrich_campaigns(
+    compute_org_campaign_ids(campaigns, ss.selected_org_id)
+)
+for campaign_id, error in campaign_errors:
+    st.error(f"Error fetching campaign {campaign_id}: {error}")
 
 campaign_options = {c.id: c.name for c in campaign_details}
 campaign_ids = list(campaign_options.keys())
@@ -225,7 +578,18 @@ uploaded_file = st.file_uploader(
 if uploaded_file is None:
     st.stop()
 
-raw_leads = csv_to_json(uploaded_file.read())
+# pandas' C parser reads the upload in place (no .read() copy); every column
+# stays a string and blanks stay "" (as csv.DictReader did). index_col=False keeps
+# rows with a trailing delimiter from shifting every value one column left. Rewind
+# first in case this rerun is handed a buffer an earlier parse already consumed.
+uploaded_file.seek(0)
+try:
+    raw_leads = pd.read_csv(
+        uploaded_file, engine="c", dtype=str, keep_default_na=False, index_col=False
+    ).to_dict("records")
+except pd.errors.EmptyDataError:
+    st.error("❌ The uploaded CSV is empty.")
+    st.stop()
 
 # Filters
 blocklisted_industries = st.text_input(
@@ -246,9 +610,10 @@ if st.button("🚀 Filter and Upload Leads", key="filter_upload_btn"):
         leads_to_remove = asyncio.run(
             process_leads(
                 raw_leads,
-                blocklisted_industries=blocklisted_industries,
-                whitelisted_industries=whitelisted_industries,
-                whitelisted_areas=whitelisted_areas,
+                # Split once per run; every check below reuses the term lists
+                blocklisted_industries=split_terms(blocklisted_industries),
+                whitelisted_industries=split_terms(whitelisted_industries),
+                whitelisted_areas=split_terms(whitelisted_areas),
             )
         )
 
@@ -272,15 +637,24 @@ if st.button("🚀 Filter and Upload Leads", key="filter_upload_btn"):
             ss.leads_to_remove = leads_to_remove
             ss.filtered_blob_url = url
 
-            # Precompute campaign leads & mapping
-            leads = get_leads_by_campaign_id_with_pagination(
-                campaign_id=int(ss.selected_campaign_id)
-            )
-            # Match by email
+            # Match by email against the campaign's (cached) lead index
+            try:
+                email_index = campaign_email_index(int(ss.selected_campaign_id))
+            except RuntimeError as e:
+                ss.lead_details = []
+                st.error(
+                    f"❌ Failed to load leads of campaign {ss.selected_campaign_name}, "
+                    f"so none can be removed yet. Try again: {e}"
+                )
+                st.stop()
+            emails_to_remove = {
+                ltr.get("Email") for ltr in leads_to_remove if ltr.get("Email")
+            }
             ss.lead_details = [
-                {"leadId": lead.lead.id, "leadMappingId": lead.campaign_lead_map_id}
-                for lead in leads
-                if any(ltr.get("Email") == lead.lead.email for ltr in leads_to_remove)
+                {"leadId": lead_id, "leadMappingId": lead_map_id}
+                for email in emails_to_remove
+                if email in email_index
+                for lead_id, lead_map_id in [email_index[email]]
             ]
 
     # Ensure the “Remove” CTA renders immediately with the computed state
@@ -308,18 +682,21 @@ if ss.lead_details:
 if ss.removing:
     with st.spinner("Removing leads... please wait"):
         try:
-            remove_multiple_leads_from_campaign(
-                smartlead_campaign_id=str(ss.selected_campaign_id),
-                email_lead_ids=[ld["leadId"] for ld in ss.lead_details],
-                email_lead_map_ids=[ld["leadMappingId"] for ld in ss.lead_details],
-            )
-        except Exception as e:
-            st.error(
-                f"❌ Failed to remove leads from campaign {ss.selected_campaign_name}: {e}"
-            )
-        else:
-            st.success(
-                f"✅ Removed {len(ss.lead_details)} leads from {ss.selected_campaign_name}."
+            removed, failed = remove_leads_in_batches(
+                ss.selected_campaign_id, ss.lead_details
             )
         finally:
             ss.removing = False
+    # Only the leads of failed batches are left to remove; a retry resends just those
+    ss.lead_details = [lead for batch, _ in failed for lead in batch]
+
+    if removed:
+        # The campaign's leads changed; don't match against the stale index
+        campaign_email_index.clear()
+        st.success(f"✅ Removed {removed} leads from {ss.selected_campaign_name}.")
+    if failed:
+        st.error(
+            f"❌ Failed to remove {len(ss.lead_details)} leads from campaign "
+            f"{ss.selected_campaign_name} ({len(failed)} failed batches): "
+            + "; ".join(dict.fromkeys(error for _, error in failed))
+        )